@@ -2,9 +2,16 @@
 Currents API endpoints - Query tidal current data for visualization
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
+import hashlib
+import logging
+import numexpr as ne
+import orjson
 import xarray as xr
 import numpy as np
 import s3fs
@@ -15,6 +22,7 @@ from ..core.config import get_settings
 
 router = APIRouter()
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
 # Pre-loaded numpy arrays (loaded once at startup, held in RAM)
@@ -23,64 +31,599 @@ class MeshData:
     lat: np.ndarray = None
     lon: np.ndarray = None
     depth: np.ndarray = None
+    # Triangle connectivity stored transposed as int32 (3, n_elements),
+    # C-contiguous: the element filter reads each vertex column as a
+    # stride-1 gather at half the bytes of the int64 (E, 3) layout
     elements: np.ndarray = None
-    u_amp: np.ndarray = None
-    v_amp: np.ndarray = None
-    u_phase: np.ndarray = None
-    v_phase: np.ndarray = None
+    # Amplitude/phase decomposed as amp*cos(phase), amp*sin(phase) so that
+    # prediction reduces to two matrix-vector products (see predict_currents).
+    # The four coefficient matrices are stacked into one (N, 4, K) block
+    # (planes: u_cos, u_sin, v_cos, v_sin) so a request fetches all of a
+    # node's coefficients with a single fancy-index gather instead of four
+    # passes over the same index list
+    harmonics: np.ndarray = None
     tidefreqs: np.ndarray = None
-    constituent_names: list = None
+    constituent_names: tuple = None
+    # Scratch buffers reused across requests (allocated once at load):
+    # bbox_bitmap for O(1) node-membership tests during element filtering,
+    # idx_map for global -> compact index remapping (-1 = not in bbox)
+    bbox_bitmap: np.ndarray = None
+    idx_map: np.ndarray = None
+    # Dataset summary for /info, computed once at load (the min/max
+    # reductions are O(N) and the values never change while running)
+    info: dict = None
     loaded: bool = False
 
 
 _mesh = MeshData()
 
 
-def _load_mesh_data():
-    """Load all static arrays from Zarr into RAM (called once at startup)."""
-    if _mesh.loaded:
-        return
+def _mesh_cache_path() -> Optional[Path]:
+    """Local snapshot path for the configured data source (None if disabled)."""
+    if not settings.MESH_CACHE_DIR:
+        return None
+    if settings.DATA_SOURCE == "LOCAL":
+        source = str(settings.LOCAL_ZARR_PATH)
+    else:
+        source = f's3://{settings.S3_BUCKET}/{settings.ZARR_PATH}'
+    digest = hashlib.md5(source.encode()).hexdigest()[:12]
+    return Path(settings.MESH_CACHE_DIR) / f"mesh_{digest}.npz"
 
-    load_start = time_module.time()
 
+def _load_from_zarr():
+    """Load and decode all static arrays from the Zarr store."""
+    # consolidated=True reads all array metadata in a single GET instead of
+    # one round-trip per array — significant against S3 (the conversion
+    # script writes consolidated metadata)
     if settings.DATA_SOURCE == "LOCAL":
-        print(f"Loading Zarr from LOCAL: {settings.LOCAL_ZARR_PATH}")
-        ds = xr.open_zarr(settings.LOCAL_ZARR_PATH, consolidated=False)
+        logger.info("Loading Zarr from LOCAL: %s", settings.LOCAL_ZARR_PATH)
+        ds = xr.open_zarr(settings.LOCAL_ZARR_PATH, consolidated=True)
     else:
         s3_path = f's3://{settings.S3_BUCKET}/{settings.ZARR_PATH}'
-        print(f"Loading Zarr from S3: {s3_path}")
+        logger.info("Loading Zarr from S3: %s", s3_path)
         s3 = s3fs.S3FileSystem(anon=False)
         store = s3fs.S3Map(root=s3_path, s3=s3, check=False)
-        ds = xr.open_zarr(store, consolidated=False)
-
-    # Pull everything into numpy arrays (one-time cost)
-    _mesh.lat = ds['lat'].values
-    _mesh.lon = ds['lon'].values
-    _mesh.depth = ds['depth'].values
-    _mesh.elements = ds['elements'].values
-    _mesh.u_amp = ds['u_amp'].values
-    _mesh.v_amp = ds['v_amp'].values
-    _mesh.u_phase = ds['u_phase'].values
-    _mesh.v_phase = ds['v_phase'].values
-    _mesh.tidefreqs = ds['tidefreqs'].values
-    _mesh.constituent_names = [str(name) for name in ds['constituent_names'].values]
+        ds = xr.open_zarr(store, consolidated=True)
+
+    # Pull everything into numpy arrays (one-time cost). The arrays are
+    # fetched concurrently: s3fs/zarr release the GIL during I/O and
+    # decompression, so against S3 this overlaps the per-array round-trips
+    # instead of paying them in series.
+    variables = ['lat', 'lon', 'depth', 'elements',
+                 'u_amp', 'v_amp', 'u_phase', 'v_phase', 'tidefreqs']
+    with ThreadPoolExecutor(max_workers=len(variables)) as executor:
+        futures = {name: executor.submit(lambda v: ds[v].values, name)
+                   for name in variables}
+        arrays = {name: future.result() for name, future in futures.items()}
+
+    # Reorder nodes by ascending latitude (and remap element connectivity)
+    # so a bbox query resolves its latitude band with two binary searches
+    # instead of a full-array scan; only the band is then tested on lon.
+    order = np.argsort(arrays['lat'], kind='stable')
+    inverse = np.empty(len(order), dtype=np.int64)
+    inverse[order] = np.arange(len(order))
+
+    _mesh.lat = arrays['lat'][order]
+    _mesh.lon = arrays['lon'][order]
+    _mesh.depth = arrays['depth'][order]
+    _mesh.elements = np.ascontiguousarray(
+        inverse[arrays['elements']].astype(np.int32).T)
+    # Decompose amplitude/phase into amp*cos(phase) and amp*sin(phase) once
+    # at load, stored as float32 (halves memory bandwidth; ~1e-7 relative
+    # precision is far beyond what cm/s current display needs). Per-request
+    # prediction then needs no per-node transcendentals at all.
+    u_amp = arrays['u_amp'][order, :]
+    v_amp = arrays['v_amp'][order, :]
+    u_phase = np.deg2rad(arrays['u_phase'][order, :])
+    v_phase = np.deg2rad(arrays['v_phase'][order, :])
+    _mesh.harmonics = np.stack([
+        (u_amp * np.cos(u_phase)).astype(np.float32),
+        (u_amp * np.sin(u_phase)).astype(np.float32),
+        (v_amp * np.cos(v_phase)).astype(np.float32),
+        (v_amp * np.sin(v_phase)).astype(np.float32),
+    ], axis=1)
+    _mesh.tidefreqs = arrays['tidefreqs']
+    # Stored as a tuple: hashable, so the memoized ttide-index and nodal-
+    # correction lookups key on it directly with no per-request conversion
+    _mesh.constituent_names = tuple(str(name) for name in ds['constituent_names'].values)
+
+
+_SNAPSHOT_ARRAYS = ['lat', 'lon', 'depth', 'elements', 'harmonics', 'tidefreqs']
+
+
+def _load_snapshot(cache_path: Path) -> bool:
+    """Load a mesh snapshot; returns False if it has a stale layout."""
+    logger.info("Loading mesh snapshot from %s", cache_path)
+    snapshot = np.load(cache_path, allow_pickle=False)
+    if ('elements' not in snapshot or snapshot['elements'].shape[0] != 3
+            or 'harmonics' not in snapshot):
+        logger.warning("Mesh snapshot %s has a stale layout, reloading from Zarr",
+                       cache_path)
+        return False
+    for name in _SNAPSHOT_ARRAYS:
+        setattr(_mesh, name, snapshot[name])
+    _mesh.constituent_names = tuple(str(n) for n in snapshot['constituent_names'])
+    return True
+
+
+def _load_mesh_data():
+    """Load all static arrays into RAM (called once at startup).
+
+    On first start the arrays are decoded from Zarr and snapshotted to a
+    local .npz; later starts read the snapshot directly, skipping Zarr
+    decompression and the cos/sin decomposition entirely.
+    """
+    if _mesh.loaded:
+        return
+
+    load_start = time_module.time()
+
+    cache_path = _mesh_cache_path()
+    from_snapshot = (cache_path is not None and cache_path.exists()
+                     and _load_snapshot(cache_path))
+    if not from_snapshot:
+        _load_from_zarr()
+        if cache_path is not None:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                np.savez(cache_path,
+                         constituent_names=np.array(_mesh.constituent_names),
+                         **{name: getattr(_mesh, name) for name in _SNAPSHOT_ARRAYS})
+                logger.info("Saved mesh snapshot to %s", cache_path)
+            except OSError as e:
+                logger.warning("Could not write mesh snapshot: %s", e)
+
+    _mesh.bbox_bitmap = np.zeros(len(_mesh.lat), dtype=np.bool_)
+    _mesh.idx_map = np.full(len(_mesh.lat), -1, dtype=np.int32)
+    _mesh.info = {
+        "total_nodes": len(_mesh.lat),
+        "total_elements": _mesh.elements.shape[1],
+        "constituents": _mesh.constituent_names,
+        "tide_frequencies": _mesh.tidefreqs.tolist(),
+        "lat_range": [float(_mesh.lat.min()), float(_mesh.lat.max())],
+        "lon_range": [float(_mesh.lon.min()), float(_mesh.lon.max())],
+        "depth_range": [float(_mesh.depth.min()), float(_mesh.depth.max())]
+    }
     _mesh.loaded = True
 
     elapsed = time_module.time() - load_start
-    print(f"Mesh data loaded into RAM in {elapsed:.2f}s "
-          f"({len(_mesh.lat)} nodes, {len(_mesh.elements)} elements, "
-          f"{len(_mesh.constituent_names)} constituents)")
+    logger.info("Mesh data loaded into RAM in %.2fs (%d nodes, %d elements, %d constituents)",
+                elapsed, len(_mesh.lat), _mesh.elements.shape[1], len(_mesh.constituent_names))
+
+
+# Responses are deterministic in (bbox, time), so requests within the same
+# time bucket (a polling frontend issues many) can share one cached payload.
+TIME_BUCKET_SECONDS = 60
+
+
+@lru_cache(maxsize=64)
+def _bbox_node_indices(min_lat: float, max_lat: float,
+                       min_lon: float, max_lon: float) -> np.ndarray:
+    """Node indices inside a bounding box (cached; node coords are static)."""
+    # Nodes are sorted by latitude at load, so the lat band is two binary
+    # searches; only that band is scanned on lon (fused with numexpr into
+    # one SIMD pass, no intermediate bool temporaries)
+    i0 = np.searchsorted(_mesh.lat, min_lat, side='left')
+    i1 = np.searchsorted(_mesh.lat, max_lat, side='right')
+    if i0 >= i1:
+        return np.empty(0, dtype=np.int64)
+
+    lon_band = _mesh.lon[i0:i1]
+    lon_mask = ne.evaluate(
+        "(lon >= min_lon) & (lon <= max_lon)",
+        local_dict={"lon": lon_band, "min_lon": min_lon, "max_lon": max_lon}
+    )
+    return np.nonzero(lon_mask)[0] + i0
+
+
+def _filter_elements(node_indices: np.ndarray) -> np.ndarray:
+    """
+    Triangles fully inside the node selection, remapped to compact indices.
+
+    Element filtering via a membership bitmap: a triangle is kept iff all
+    three vertices fall inside the bbox. Indexing the bitmap is a plain
+    O(E) gather — much cheaper than np.isin's hashtable lookups.
+    """
+    in_bbox = _mesh.bbox_bitmap
+    in_bbox.fill(False)
+    in_bbox[node_indices] = True
+    valid_mask = (
+        in_bbox[_mesh.elements[0]] &
+        in_bbox[_mesh.elements[1]] &
+        in_bbox[_mesh.elements[2]]
+    )
+    valid_elements = _mesh.elements[:, valid_mask]
+
+    if valid_elements.shape[1] == 0:
+        return np.empty((0, 3), dtype=np.int32)
+
+    # Remap to compact 0-based indices using the preallocated buffer:
+    # touch only the k in-bbox entries instead of allocating and filling
+    # a full-N array per request, then restore them to -1
+    _mesh.idx_map[node_indices] = np.arange(len(node_indices), dtype=np.int32)
+    elements_remapped = np.ascontiguousarray(_mesh.idx_map[valid_elements].T)
+    _mesh.idx_map[node_indices] = -1
+    return elements_remapped
+
+
+def _check_node_count(num_nodes: int):
+    """Reject empty or oversized bbox selections."""
+    if num_nodes == 0:
+        raise HTTPException(status_code=404, detail="No nodes found in bounding box")
+
+    if num_nodes > 500_000:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many nodes ({num_nodes}). Please use a smaller bounding box."
+        )
+
+
+def _pack_binary(header: dict, buffers: list) -> bytes:
+    """
+    Pack a binary /mesh payload: 4-byte little-endian header length,
+    JSON header, then the raw buffers back to back.
+
+    buffers is a list of (name, ndarray); the header is extended with
+    dtype/count/offset per buffer (offsets relative to the end of the
+    header) so a client can map each one onto a typed array directly.
+    """
+    entries = []
+    offset = 0
+    for name, arr in buffers:
+        entries.append({
+            "name": name,
+            "dtype": str(arr.dtype),
+            "count": int(arr.size),
+            "offset": offset
+        })
+        offset += arr.nbytes
+    header["buffers"] = entries
+    header_bytes = orjson.dumps(header)
+    return (len(header_bytes).to_bytes(4, 'little')
+            + header_bytes
+            + b''.join(arr.tobytes() for _, arr in buffers))
+
+
+@lru_cache(maxsize=256)
+def _compute_mesh_payload(min_lat: float, max_lat: float,
+                          min_lon: float, max_lon: float,
+                          time_iso: str,
+                          include_elements: bool,
+                          include_depth: bool,
+                          binary: bool = False) -> bytes:
+    """
+    Build the serialized /mesh response for one (bbox, time bucket) key.
+
+    Memoizes the full payload bytes so cache hits skip the numpy pipeline
+    and serialization entirely.
+    """
+    prediction_time = datetime.fromisoformat(time_iso)
+
+    node_indices = _bbox_node_indices(min_lat, max_lat, min_lon, max_lon)
+    num_nodes = len(node_indices)
+    _check_node_count(num_nodes)
+
+    # Extract node positions (direct numpy slicing on RAM arrays)
+    lats = _mesh.lat[node_indices]
+    lons = _mesh.lon[node_indices]
+
+    # One gather pulls all four coefficient planes for the selected nodes;
+    # the planes passed on are views into that contiguous block
+    coeffs = _mesh.harmonics[node_indices]
+    u_vel, v_vel = predict_currents(
+        u_cos=coeffs[:, 0],
+        u_sin=coeffs[:, 1],
+        v_cos=coeffs[:, 2],
+        v_sin=coeffs[:, 3],
+        tidefreqs=_mesh.tidefreqs,
+        constituent_names=_mesh.constituent_names,
+        time_utc=prediction_time,
+        lat=settings.LATITUDE_FOR_NODAL
+    )
+
+    depth = _mesh.depth[node_indices] if include_depth else None
+    elements_remapped = _filter_elements(node_indices) if include_elements else None
+
+    if binary:
+        # Binary mode: JSON header + concatenated typed buffers that the
+        # WebGL client maps onto Float32Array/Int32Array without JSON
+        # parsing of per-node values
+        header = {
+            "time": prediction_time.isoformat(),
+            "node_count": num_nodes,
+            "constituents": _mesh.constituent_names,
+        }
+        buffers = [
+            ("lat", lats.astype(np.float32)),
+            ("lon", lons.astype(np.float32)),
+            ("u_velocity", u_vel.astype(np.float32, copy=False)),
+            ("v_velocity", v_vel.astype(np.float32, copy=False)),
+        ]
+        if depth is not None:
+            buffers.append(("depth", depth.astype(np.float32)))
+        if elements_remapped is not None:
+            header["element_count"] = len(elements_remapped)
+            buffers.append(("triangles",
+                            elements_remapped.astype(np.int32, copy=False)))
+        return _pack_binary(header, buffers)
+
+    # Build response
+    response = {
+        "time": prediction_time.isoformat(),
+        "nodes": {
+            "count": num_nodes,
+            "lat": lats,
+            "lon": lons,
+            "u_velocity": u_vel,
+            "v_velocity": v_vel
+        },
+        "constituents": _mesh.constituent_names
+    }
+
+    # Optional fields (skip to reduce payload)
+    if depth is not None:
+        response["nodes"]["depth"] = depth
+
+    if elements_remapped is not None:
+        response["elements"] = {
+            "count": len(elements_remapped),
+            "triangles": elements_remapped
+        }
+
+    # orjson serializes the numpy arrays directly — no .tolist() boxing of
+    # hundreds of thousands of floats into Python objects
+    return orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+@lru_cache(maxsize=64)
+def _compute_topology_payload(min_lat: float, max_lat: float,
+                              min_lon: float, max_lon: float,
+                              include_depth: bool,
+                              binary: bool = False) -> bytes:
+    """
+    Static mesh topology for a bbox: node coordinates (+depth) and
+    triangles. Time-independent, so it can be cached indefinitely.
+    """
+    node_indices = _bbox_node_indices(min_lat, max_lat, min_lon, max_lon)
+    num_nodes = len(node_indices)
+    _check_node_count(num_nodes)
+
+    lats = _mesh.lat[node_indices]
+    lons = _mesh.lon[node_indices]
+    depth = _mesh.depth[node_indices] if include_depth else None
+    triangles = _filter_elements(node_indices)
+
+    if binary:
+        header = {
+            "node_count": num_nodes,
+            "element_count": len(triangles),
+        }
+        buffers = [
+            ("lat", lats.astype(np.float32)),
+            ("lon", lons.astype(np.float32)),
+        ]
+        if depth is not None:
+            buffers.append(("depth", depth.astype(np.float32)))
+        buffers.append(("triangles", triangles.astype(np.int32, copy=False)))
+        return _pack_binary(header, buffers)
+
+    response = {
+        "nodes": {
+            "count": num_nodes,
+            "lat": lats,
+            "lon": lons
+        },
+        "elements": {
+            "count": len(triangles),
+            "triangles": triangles
+        }
+    }
+    if depth is not None:
+        response["nodes"]["depth"] = depth
+
+    return orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+@lru_cache(maxsize=512)
+def _compute_velocity_payload(min_lat: float, max_lat: float,
+                              min_lon: float, max_lon: float,
+                              time_iso: str,
+                              binary: bool = False) -> bytes:
+    """
+    Velocities only, aligned to the node order of /mesh/topology for the
+    same bbox — the hot polling payload.
+    """
+    prediction_time = datetime.fromisoformat(time_iso)
+
+    node_indices = _bbox_node_indices(min_lat, max_lat, min_lon, max_lon)
+    num_nodes = len(node_indices)
+    _check_node_count(num_nodes)
+
+    coeffs = _mesh.harmonics[node_indices]
+    u_vel, v_vel = predict_currents(
+        u_cos=coeffs[:, 0],
+        u_sin=coeffs[:, 1],
+        v_cos=coeffs[:, 2],
+        v_sin=coeffs[:, 3],
+        tidefreqs=_mesh.tidefreqs,
+        constituent_names=_mesh.constituent_names,
+        time_utc=prediction_time,
+        lat=settings.LATITUDE_FOR_NODAL
+    )
+
+    if binary:
+        header = {
+            "time": prediction_time.isoformat(),
+            "node_count": num_nodes,
+        }
+        buffers = [
+            ("u_velocity", u_vel.astype(np.float32, copy=False)),
+            ("v_velocity", v_vel.astype(np.float32, copy=False)),
+        ]
+        return _pack_binary(header, buffers)
+
+    response = {
+        "time": prediction_time.isoformat(),
+        "count": num_nodes,
+        "u_velocity": u_vel,
+        "v_velocity": v_vel
+    }
+    return orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _parse_time_param(time: Optional[str]) -> datetime:
+    """Parse the optional ISO 8601 time query param (defaults to now)."""
+    if time:
+        try:
+            return datetime.fromisoformat(time.replace('Z', '+00:00'))
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid time format: {time}. Use ISO 8601 format (e.g., 2026-02-05T12:00:00Z)"
+            )
+    return datetime.now(timezone.utc)
+
+
+def _bucket_time(prediction_time: datetime) -> datetime:
+    """Round down to TIME_BUCKET_SECONDS so nearby requests share a cache entry."""
+    bucket_seconds = (int(prediction_time.timestamp())
+                      // TIME_BUCKET_SECONDS * TIME_BUCKET_SECONDS)
+    return datetime.fromtimestamp(bucket_seconds, tz=timezone.utc)
+
+
+def _payload_etag(*key_parts) -> str:
+    """ETag for a response, derived from its cache key.
+
+    Payloads are deterministic in their cache key (the mesh is static per
+    deployment and time is bucketed), so hashing the key is as strong as
+    hashing the payload bytes while staying O(1) in payload size.
+    """
+    return f'"{hashlib.md5(repr(key_parts).encode()).hexdigest()}"'
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response if the client already holds the current payload."""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+def _check_format(format: str):
+    """Validate the response format query param."""
+    if format not in ("json", "binary"):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format: {format}. Use 'json' or 'binary'"
+        )
+
+
+@router.get("/mesh/topology")
+async def get_mesh_topology(
+    request: Request,
+    min_lat: float = Query(..., description="Minimum latitude", ge=-90, le=90),
+    max_lat: float = Query(..., description="Maximum latitude", ge=-90, le=90),
+    min_lon: float = Query(..., description="Minimum longitude", ge=-180, le=180),
+    max_lon: float = Query(..., description="Maximum longitude", ge=-180, le=180),
+    include_depth: bool = Query(True, description="Include depth data in response"),
+    format: str = Query("json", description="Response format: 'json' or 'binary'")
+):
+    """
+    Get the static mesh topology (nodes + triangles) for a bounding box.
+
+    Triangle connectivity never changes, so the client fetches this once
+    per pan/zoom and it is served with a long cache lifetime (CDN-able).
+    Poll /mesh/velocity for the time-varying part.
+    """
+    try:
+        _check_format(format)
+        _load_mesh_data()
+
+        binary = format == "binary"
+        etag = _payload_etag("topology", min_lat, max_lat, min_lon, max_lon,
+                             include_depth, binary)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        payload = _compute_topology_payload(
+            min_lat, max_lat, min_lon, max_lon, include_depth, binary=binary
+        )
+
+        media_type = "application/octet-stream" if binary else "application/json"
+        return Response(
+            content=payload,
+            media_type=media_type,
+            headers={"Cache-Control": "public, max-age=3600, immutable",
+                     "ETag": etag}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/mesh/velocity")
+async def get_mesh_velocity(
+    request: Request,
+    min_lat: float = Query(..., description="Minimum latitude", ge=-90, le=90),
+    max_lat: float = Query(..., description="Maximum latitude", ge=-90, le=90),
+    min_lon: float = Query(..., description="Minimum longitude", ge=-180, le=180),
+    max_lon: float = Query(..., description="Maximum longitude", ge=-180, le=180),
+    time: Optional[str] = Query(None, description="ISO 8601 datetime (defaults to current time)"),
+    format: str = Query("json", description="Response format: 'json' or 'binary'")
+):
+    """
+    Get predicted current velocities for a bounding box.
+
+    Returns only u/v arrays, aligned to the node order of /mesh/topology
+    for the same bbox — the payload the frontend polls every few seconds.
+    """
+    try:
+        _check_format(format)
+        _load_mesh_data()
+
+        prediction_time = _parse_time_param(time)
+
+        binary = format == "binary"
+        time_key = _bucket_time(prediction_time).isoformat()
+        # A scrubbing client replaying a recent time bucket revalidates with
+        # If-None-Match and gets an empty 304 instead of the full payload
+        etag = _payload_etag("velocity", min_lat, max_lat, min_lon, max_lon,
+                             time_key, binary)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        payload = _compute_velocity_payload(
+            min_lat, max_lat, min_lon, max_lon, time_key, binary=binary
+        )
+
+        media_type = "application/octet-stream" if binary else "application/json"
+        return Response(
+            content=payload,
+            media_type=media_type,
+            headers={"Cache-Control": f"public, max-age={TIME_BUCKET_SECONDS}",
+                     "ETag": etag}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/mesh")
 async def get_mesh_data(
+    request: Request,
     min_lat: float = Query(..., description="Minimum latitude", ge=-90, le=90),
     max_lat: float = Query(..., description="Maximum latitude", ge=-90, le=90),
     min_lon: float = Query(..., description="Minimum longitude", ge=-180, le=180),
     max_lon: float = Query(..., description="Maximum longitude", ge=-180, le=180),
     time: Optional[str] = Query(None, description="ISO 8601 datetime (defaults to current time)"),
     include_elements: bool = Query(True, description="Include triangle elements in response"),
-    include_depth: bool = Query(True, description="Include depth data in response")
+    include_depth: bool = Query(True, description="Include depth data in response"),
+    format: str = Query("json", description="Response format: 'json' or 'binary'")
 ):
     """
     Get triangular mesh data and current velocities for a bounding box.
@@ -91,94 +634,37 @@ async def get_mesh_data(
     try:
         start_time = time_module.time()
 
+        _check_format(format)
+
         # Ensure data is loaded
         _load_mesh_data()
 
-        # Query nodes in bounding box (pure numpy — microseconds)
-        bbox_mask = (
-            (_mesh.lat >= min_lat) & (_mesh.lat <= max_lat) &
-            (_mesh.lon >= min_lon) & (_mesh.lon <= max_lon)
-        )
-        node_indices = np.where(bbox_mask)[0]
-        num_nodes = len(node_indices)
-
-        if num_nodes == 0:
-            raise HTTPException(status_code=404, detail="No nodes found in bounding box")
-
-        if num_nodes > 500_000:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Too many nodes ({num_nodes}). Please use a smaller bounding box."
-            )
+        prediction_time = _parse_time_param(time)
 
-        # Extract node positions (direct numpy slicing on RAM arrays)
-        lats = _mesh.lat[node_indices]
-        lons = _mesh.lon[node_indices]
+        binary = format == "binary"
+        time_key = _bucket_time(prediction_time).isoformat()
+        etag = _payload_etag("mesh", min_lat, max_lat, min_lon, max_lon,
+                             time_key, include_elements, include_depth, binary)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
 
-        # Parse time parameter
-        if time:
-            try:
-                prediction_time = datetime.fromisoformat(time.replace('Z', '+00:00'))
-            except ValueError:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid time format: {time}. Use ISO 8601 format (e.g., 2026-02-05T12:00:00Z)"
-                )
-        else:
-            prediction_time = datetime.now(timezone.utc)
-
-        # Extract constituent data and predict velocities (numpy slicing — fast)
-        u_vel, v_vel = predict_currents(
-            u_amp=_mesh.u_amp[node_indices, :],
-            v_amp=_mesh.v_amp[node_indices, :],
-            u_phase=_mesh.u_phase[node_indices, :],
-            v_phase=_mesh.v_phase[node_indices, :],
-            tidefreqs=_mesh.tidefreqs,
-            constituent_names=_mesh.constituent_names,
-            time_utc=prediction_time,
-            lat=settings.LATITUDE_FOR_NODAL
+        payload = _compute_mesh_payload(
+            min_lat, max_lat, min_lon, max_lon, time_key,
+            include_elements, include_depth,
+            binary=binary
         )
 
-        # Build response
-        response = {
-            "time": prediction_time.isoformat(),
-            "nodes": {
-                "count": num_nodes,
-                "lat": lats.tolist(),
-                "lon": lons.tolist(),
-                "u_velocity": u_vel.tolist(),
-                "v_velocity": v_vel.tolist()
-            },
-            "constituents": _mesh.constituent_names
-        }
-
-        # Optional fields (skip to reduce payload)
-        if include_depth:
-            response["nodes"]["depth"] = _mesh.depth[node_indices].tolist()
-
-        if include_elements:
-            # Vectorized element filtering
-            mask_0 = np.isin(_mesh.elements[:, 0], node_indices)
-            mask_1 = np.isin(_mesh.elements[:, 1], node_indices)
-            mask_2 = np.isin(_mesh.elements[:, 2], node_indices)
-            valid_elements = _mesh.elements[mask_0 & mask_1 & mask_2]
-
-            if len(valid_elements) > 0:
-                # Remap to compact 0-based indices
-                idx_map = np.empty(_mesh.lat.shape[0], dtype=np.int32)
-                idx_map[node_indices] = np.arange(num_nodes, dtype=np.int32)
-                elements_remapped = idx_map[valid_elements]
-                response["elements"] = {
-                    "count": len(elements_remapped),
-                    "triangles": elements_remapped.tolist()
-                }
-            else:
-                response["elements"] = {"count": 0, "triangles": []}
-
         elapsed = time_module.time() - start_time
-        print(f"Mesh query: {num_nodes} nodes in {elapsed:.3f}s")
-
-        return response
+        logger.debug("Mesh query in %.3fs", elapsed)
+
+        media_type = "application/octet-stream" if binary else "application/json"
+        return Response(
+            content=payload,
+            media_type=media_type,
+            headers={"Cache-Control": f"public, max-age={TIME_BUCKET_SECONDS}",
+                     "ETag": etag}
+        )
 
     except HTTPException:
         raise
@@ -188,18 +674,10 @@ async def get_mesh_data(
 
 @router.get("/info")
 async def get_dataset_info():
-    """Get information about the dataset"""
+    """Get information about the dataset (precomputed at load)"""
     try:
         _load_mesh_data()
 
-        return {
-            "total_nodes": len(_mesh.lat),
-            "total_elements": len(_mesh.elements),
-            "constituents": _mesh.constituent_names,
-            "tide_frequencies": _mesh.tidefreqs.tolist(),
-            "lat_range": [float(_mesh.lat.min()), float(_mesh.lat.max())],
-            "lon_range": [float(_mesh.lon.min()), float(_mesh.lon.max())],
-            "depth_range": [float(_mesh.depth.min()), float(_mesh.depth.max())]
-        }
+        return _mesh.info
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -24,6 +24,10 @@ class Settings(BaseSettings):
     DATA_SOURCE: str = "S3"  # Options: "LOCAL" or "S3"
     LOCAL_ZARR_PATH: str = "../../data/adcirc54.zarr"
 
+    # Local snapshot of the decoded mesh arrays for fast cold starts
+    # (set to "" to always load from Zarr)
+    MESH_CACHE_DIR: str = "../../data/mesh_cache"
+
     # Tidal prediction settings
     REFERENCE_TIME: str = "2000-01-01T00:00:00Z"  # ADCIRC reference time
     LATITUDE_FOR_NODAL: float = 55.0  # Used for nodal corrections
@@ -5,6 +5,8 @@ Implements the ADCIRC tidal harmonic prediction algorithm with nodal corrections
 """
 
 from datetime import datetime, timezone
+from functools import lru_cache
+import logging
 import numpy as np
 from matplotlib.dates import date2num
 from ttide.t_vuf import t_vuf
@@ -13,6 +15,8 @@ from ttide.t_vuf import t_vuf
 # ADCIRC reference time: 2000-01-01 00:00:00 UTC
 REFERENCE_TIME = datetime(2000, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
 
+logger = logging.getLogger(__name__)
+
 
 # Standard ADCIRC constituent mapping to ttide indices
 # These are the standard 8 tidal constituents used in ADCIRC
@@ -28,9 +32,10 @@ _STANDARD_CONST_INDICES = {
 }
 
 
-def _get_ttide_indices(constituent_names):
+@lru_cache(maxsize=16)
+def _get_ttide_indices(constituent_names: tuple):
     """
-    Get ttide constituent indices for given names
+    Get ttide constituent indices for given names (tuple, for caching)
 
     For standard ADCIRC constituents, use hardcoded mapping.
     This avoids issues with ttide's constituent table format.
@@ -41,17 +46,65 @@ def _get_ttide_indices(constituent_names):
             indices.append(_STANDARD_CONST_INDICES[name])
         else:
             # Fallback: use sequential index
-            print(f"Warning: Constituent {name} not in standard mapping, using sequential index")
+            logger.warning("Constituent %s not in standard mapping, using sequential index", name)
             indices.append(len(indices))
 
     return np.array(indices)
 
 
+@lru_cache(maxsize=4096)
+def _nodal_params(minute_key: int, constituent_names: tuple, lat: float):
+    """
+    Nodal corrections (v_rad, u_rad, f_node) for one minute bucket.
+
+    The t_vuf call (trig-heavy astronomical argument math) depends only on
+    time and the fixed constituent set, never on nodes, and nodal
+    corrections evolve over months — caching at minute granularity is
+    lossless in practice and makes repeated predictions for the same
+    minute free.
+    """
+    time_utc = datetime.fromtimestamp(minute_key * 60, tz=timezone.utc)
+
+    # Convert to matplotlib date format (days since 0001-01-01 UTC + 366)
+    # This is the format expected by ttide
+    mpl_date = date2num(time_utc) + 366
+
+    ttide_indices = _get_ttide_indices(constituent_names)
+
+    # Get nodal corrections from ttide
+    # v, u are in "cycles" (not degrees or radians), f is dimensionless
+    v_node, u_node, f_node = t_vuf('nodal', mpl_date, ju=ttide_indices, lat=lat)
+
+    # Squeeze any extra dimensions and convert cycles -> radians
+    v_rad = np.squeeze(v_node) * 2 * np.pi
+    u_rad = np.squeeze(u_node) * 2 * np.pi
+    f_node = np.squeeze(f_node)
+
+    return v_rad, u_rad, f_node
+
+
+# Scratch output buffers reused across calls, grown to the largest request
+# seen so far. Avoids tens of MB of malloc/free per large-bbox request.
+_scratch = {'u': np.empty(0, dtype=np.float32),
+            'v': np.empty(0, dtype=np.float32),
+            'tmp': np.empty(0, dtype=np.float32)}
+
+
+def _scratch_buffers(n_nodes: int):
+    """Views of length n_nodes into the reusable output buffers."""
+    if _scratch['u'].size < n_nodes:
+        for key in _scratch:
+            _scratch[key] = np.empty(n_nodes, dtype=np.float32)
+    return (_scratch['u'][:n_nodes],
+            _scratch['v'][:n_nodes],
+            _scratch['tmp'][:n_nodes])
+
+
 def predict_currents(
-    u_amp: np.ndarray,      # Shape: (n_nodes, n_constituents)
-    v_amp: np.ndarray,      # Shape: (n_nodes, n_constituents)
-    u_phase: np.ndarray,    # Shape: (n_nodes, n_constituents) - degrees
-    v_phase: np.ndarray,    # Shape: (n_nodes, n_constituents) - degrees
+    u_cos: np.ndarray,      # Shape: (n_nodes, n_constituents) - u_amp * cos(u_phase)
+    u_sin: np.ndarray,      # Shape: (n_nodes, n_constituents) - u_amp * sin(u_phase)
+    v_cos: np.ndarray,      # Shape: (n_nodes, n_constituents) - v_amp * cos(v_phase)
+    v_sin: np.ndarray,      # Shape: (n_nodes, n_constituents) - v_amp * sin(v_phase)
     tidefreqs: np.ndarray,  # Shape: (n_constituents,) - rad/s
     constituent_names: list,  # List of constituent names (e.g., ['M2', 'S2', ...])
     time_utc: datetime,
@@ -64,6 +117,13 @@ def predict_currents(
         U = Σ [ f[i] * u_amp[i] * cos(v[i] + ω[i]*t + u[i] - u_phase[i]) ]
         V = Σ [ f[i] * v_amp[i] * cos(v[i] + ω[i]*t + u[i] - v_phase[i]) ]
 
+    using the angle-difference identity
+        A·cos(θ - φ) = (A·cos φ)·cos θ + (A·sin φ)·sin θ
+
+    so the node-static factors (A·cos φ, A·sin φ) are precomputed once at
+    load time and each request reduces to two matrix-vector products
+    against the per-constituent scalars f·cos θ and f·sin θ.
+
     where:
         v = equilibrium argument (astronomic phase offset)
         u = Greenwich phase lag
@@ -72,10 +132,10 @@ def predict_currents(
         t = time in seconds since reference epoch
 
     Args:
-        u_amp: Eastward velocity amplitudes (m/s)
-        v_amp: Northward velocity amplitudes (m/s)
-        u_phase: Eastward velocity phases (degrees)
-        v_phase: Northward velocity phases (degrees)
+        u_cos: Eastward amplitude times cos(phase), per node/constituent
+        u_sin: Eastward amplitude times sin(phase), per node/constituent
+        v_cos: Northward amplitude times cos(phase), per node/constituent
+        v_sin: Northward amplitude times sin(phase), per node/constituent
         tidefreqs: Angular frequencies for each constituent (rad/s)
         constituent_names: Names of tidal constituents (e.g., ['M2', 'S2', 'N2', ...])
         time_utc: Prediction time
@@ -83,33 +143,17 @@ def predict_currents(
 
     Returns:
         (u_velocity, v_velocity) - Instantaneous velocities in m/s
-            Shape: (n_nodes,) for each
+            Shape: (n_nodes,) for each. These are views into reusable
+            scratch buffers, valid until the next predict_currents call —
+            copy if they must outlive it.
     """
     # Ensure datetime is timezone-aware
     if time_utc.tzinfo is None:
         time_utc = time_utc.replace(tzinfo=timezone.utc)
 
-    # Convert to matplotlib date format (days since 0001-01-01 UTC + 366)
-    # This is the format expected by ttide
-    mpl_date = date2num(time_utc) + 366
-
-    # Get ttide constituent indices
-    ttide_indices = _get_ttide_indices(constituent_names)
-
-    # Get nodal corrections from ttide
-    # v, u are in "cycles" (not degrees or radians), f is dimensionless
-    # Returns arrays of shape (n_constituents,)
-    v_node, u_node, f_node = t_vuf('nodal', mpl_date, ju=ttide_indices, lat=lat)
-
-    # Squeeze any extra dimensions
-    v_node = np.squeeze(v_node)
-    u_node = np.squeeze(u_node)
-    f_node = np.squeeze(f_node)
-
-    # Convert v and u from cycles to radians
-    # (ttide returns cycles, need to multiply by 2π)
-    v_rad = v_node * 2 * np.pi  # Shape: (n_constituents,)
-    u_rad = u_node * 2 * np.pi  # Shape: (n_constituents,)
+    # Nodal corrections, cached per minute (node-independent)
+    minute_key = int(time_utc.timestamp()) // 60
+    v_rad, u_rad, f_node = _nodal_params(minute_key, tuple(constituent_names), lat)
 
     # Calculate seconds since ADCIRC reference time
     time_delta = time_utc - REFERENCE_TIME
@@ -119,24 +163,22 @@ def predict_currents(
     # tidefreqs is in rad/s, t_seconds is in seconds
     omega_t = tidefreqs * t_seconds  # Shape: (n_constituents,)
 
-    # Convert phase data from degrees to radians
-    u_phase_rad = np.deg2rad(u_phase)  # Shape: (n_nodes, n_constituents)
-    v_phase_rad = np.deg2rad(v_phase)  # Shape: (n_nodes, n_constituents)
-
-    # Initialize velocity arrays
-    n_nodes = u_amp.shape[0]
-    u_velocity = np.zeros(n_nodes)
-    v_velocity = np.zeros(n_nodes)
-
-    # Harmonic synthesis - sum contributions from all constituents
-    # Loop over constituents to properly handle broadcasting
-    for i in range(len(constituent_names)):
-        # Calculate phase angles for this constituent
-        phase_u = v_rad[i] + omega_t[i] + u_rad[i] - u_phase_rad[:, i]
-        phase_v = v_rad[i] + omega_t[i] + u_rad[i] - v_phase_rad[:, i]
-
-        # Add contribution from this constituent
-        u_velocity += f_node[i] * u_amp[:, i] * np.cos(phase_u)
-        v_velocity += f_node[i] * v_amp[:, i] * np.cos(phase_v)
+    # Node-independent phase offset per constituent (radians)
+    phase_const = v_rad + omega_t + u_rad  # Shape: (n_constituents,)
+
+    # Per-constituent scalars; the only transcendentals in the request path
+    # (2 * n_constituents of them, regardless of node count)
+    f_cos = (f_node * np.cos(phase_const)).astype(np.float32)
+    f_sin = (f_node * np.sin(phase_const)).astype(np.float32)
+
+    # Harmonic synthesis as two BLAS matrix-vector products per component,
+    # written into the reusable scratch buffers (no per-request allocation)
+    u_velocity, v_velocity, tmp = _scratch_buffers(u_cos.shape[0])
+    np.dot(u_cos, f_cos, out=u_velocity)
+    np.dot(u_sin, f_sin, out=tmp)
+    u_velocity += tmp
+    np.dot(v_cos, f_cos, out=v_velocity)
+    np.dot(v_sin, f_sin, out=tmp)
+    v_velocity += tmp
 
     return u_velocity, v_velocity
@@ -0,0 +1,123 @@
+"""
+Shared Zarr store access for the query and plot scripts.
+
+test_zarr_query.py and plot_zarr_data.py used to carry copy-pasted
+versions of query_bounding_box; keeping it here means the query
+optimizations live in one place and numba's cache=True artifact is
+compiled once and reused by both scripts.
+"""
+
+import functools
+import pickle
+
+import numba
+import numpy as np
+import xarray as xr
+from pathlib import Path
+
+
+ZARR_STORE = Path(__file__).parent.parent.parent / "data" / "adcirc54.zarr"
+
+
+@functools.lru_cache(maxsize=4)
+def open_store(store: str):
+    """Open a Zarr store once per path and reuse it (read-only), skipping
+    repeated consolidated-metadata parsing and codec setup."""
+    return xr.open_zarr(store, consolidated=True)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_kdtree(path: str):
+    """Load the KD-tree sidecar written by convert_to_zarr, if present."""
+    if not Path(path).exists():
+        return None
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+@numba.njit(parallel=True, cache=True)
+def _bbox_indices(lat, lon, min_lat, max_lat, min_lon, max_lon):
+    """Single-pass bbox membership returning compact node indices.
+
+    The numpy spelling allocates three intermediate boolean arrays and
+    sweeps memory four times; this counts and fills per block in two
+    parallel passes and writes only the matching indices.
+    """
+    n = lat.size
+    n_blocks = 64
+    block = (n + n_blocks - 1) // n_blocks
+    counts = np.zeros(n_blocks + 1, np.int64)
+    for b in numba.prange(n_blocks):
+        cnt = 0
+        for i in range(b * block, min((b + 1) * block, n)):
+            if min_lat <= lat[i] <= max_lat and min_lon <= lon[i] <= max_lon:
+                cnt += 1
+        counts[b + 1] = cnt
+    offsets = np.cumsum(counts)
+    out = np.empty(offsets[-1], np.int64)
+    for b in numba.prange(n_blocks):
+        pos = offsets[b]
+        for i in range(b * block, min((b + 1) * block, n)):
+            if min_lat <= lat[i] <= max_lat and min_lon <= lon[i] <= max_lon:
+                out[pos] = i
+                pos += 1
+    return out
+
+
+def query_bounding_box(ds, min_lat, max_lat, min_lon, max_lon):
+    """
+    Query nodes within a bounding box.
+
+    Args:
+        ds: xarray Dataset opened from Zarr
+        min_lat, max_lat: Latitude bounds
+        min_lon, max_lon: Longitude bounds
+
+    Returns:
+        xarray Dataset with filtered nodes
+    """
+    # Fastest path: the conversion writes a KD-tree sidecar over (lon,
+    # lat). One ball query around the bbox centre resolves candidates in
+    # O(log N + k), and the exact test runs on the tree's own coordinate
+    # copy — the query never scans the store's lat/lon arrays
+    tree = _load_kdtree(str(ZARR_STORE.parent / (ZARR_STORE.stem + '.kdtree.pkl')))
+    if tree is not None:
+        center = ((min_lon + max_lon) / 2.0, (min_lat + max_lat) / 2.0)
+        radius = np.hypot(max_lon - center[0], max_lat - center[1])
+        candidates = np.asarray(tree.query_ball_point(center, radius), dtype=np.int64)
+        pts = tree.data[candidates]
+        keep = np.nonzero((pts[:, 1] >= min_lat) & (pts[:, 1] <= max_lat) &
+                          (pts[:, 0] >= min_lon) & (pts[:, 0] <= max_lon))[0]
+        return ds.isel(node=xr.DataArray(candidates[keep], dims='node'))
+
+    # Coarse prune: the store carries a bounding rectangle per node
+    # chunk (chunk_bbox), so only the lat/lon chunks that intersect the
+    # query rectangle are fetched instead of sweeping the full mesh
+    chunk_size = int(ds.attrs.get('chunk_size_nodes', 0))
+    if chunk_size and 'chunk_bbox' in ds:
+        cb = ds['chunk_bbox'].values  # (n_chunks, 4): lat_min/max, lon_min/max
+        hits = np.nonzero((cb[:, 0] <= max_lat) & (cb[:, 1] >= min_lat) &
+                          (cb[:, 2] <= max_lon) & (cb[:, 3] >= min_lon))[0]
+        n_node = ds.sizes['node']
+        if len(hits) > 0:
+            candidates = np.concatenate(
+                [np.arange(h * chunk_size, min((h + 1) * chunk_size, n_node))
+                 for h in hits])
+        else:
+            candidates = np.empty(0, dtype=np.int64)
+        cand_idx = xr.DataArray(candidates, dims='node')
+        lat = ds['lat'].isel(node=cand_idx).values
+        lon = ds['lon'].isel(node=cand_idx).values
+    else:
+        # Store without chunk metadata: fall back to a full scan
+        candidates = None
+        lat = ds['lat'].values
+        lon = ds['lon'].values
+
+    # Exact membership on raw NumPy arrays via the parallel kernel, then
+    # gather the matching nodes by position: unlike where(drop=True) this
+    # never broadcasts a mask across the (node, constituent) variables
+    keep = _bbox_indices(lat, lon, min_lat, max_lat, min_lon, max_lon)
+    idx = candidates[keep] if candidates is not None else keep
+
+    return ds.isel(node=xr.DataArray(idx, dims='node'))
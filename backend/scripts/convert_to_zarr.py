@@ -9,11 +9,13 @@ Usage:
     python convert_to_zarr.py
 """
 
+import numba
 import numpy as np
 import xarray as xr
 import zarr
-from numcodecs import Blosc
+from zarr.codecs import BloscCodec
 from pathlib import Path
+import os
 import sys
 import time
 
@@ -21,6 +23,7 @@ import time
 # Configuration
 NC_FILE = Path(__file__).parent.parent.parent / "data" / "adcirc54.nc"
 ZARR_OUTPUT = Path(__file__).parent.parent.parent / "data" / "adcirc54.zarr"
+KDTREE_SIDECAR = Path(__file__).parent.parent.parent / "data" / "adcirc54.kdtree.pkl"
 
 # Main tidal constituents to extract (can adjust this list)
 MAIN_CONSTITUENTS = ['M2', 'S2', 'N2', 'K1', 'O1', 'P1', 'M4', 'M6']
@@ -33,12 +36,21 @@ SPATIAL_ORDER_METHOD = 'hilbert'
 # Spatial chunking configuration
 # Chunk size determines trade-off between query speed and overhead
 # Smaller chunks = faster loading for small viewports, more files
-SPATIAL_CHUNK_SIZE = 10_000  # ~207 chunks for 2M nodes (more granular)
+SPATIAL_CHUNK_SIZE = 10_000  # inner chunk; shard size derived from TARGET_CHUNK_BYTES
+
+# Compressed-object size to aim for per chunk — the S3 byte-range
+# sweet spot, so bbox queries pay for few, well-amortized HTTP GETs
+TARGET_CHUNK_BYTES = 8 * 1024 * 1024
 
 # Element (triangle) chunking
 # Smaller chunks for faster element loading
 ELEMENT_CHUNK_SIZE = 50_000
 
+# Whether to store the sorted->original node permutation. Nothing in the
+# API reads it, and a random permutation is essentially incompressible,
+# so it is off by default; enable for debugging round trips to the netCDF
+STORE_ORIGINAL_INDEX = False
+
 
 def parse_tide_names(tidenames_array):
     """
@@ -50,18 +62,15 @@ def parse_tide_names(tidenames_array):
     Returns:
         List of tide constituent names
     """
-    names = []
-    for tide in tidenames_array:
-        # Decode bytes to string and strip whitespace
-        if isinstance(tide, bytes):
-            name = tide.decode('utf-8').strip()
-        else:
-            # Handle case where it's already a string
-            name = str(tide).strip()
-        names.append(name)
-    return names
+    # Decode and strip all names in one vectorized pass for bytes arrays
+    if getattr(tidenames_array, 'dtype', None) is not None \
+            and tidenames_array.dtype.kind == 'S':
+        return np.char.strip(np.char.decode(tidenames_array, 'utf-8')).tolist()
+    # Handle case where it's already a string array
+    return [str(tide).strip() for tide in tidenames_array]
 
 
+@numba.njit(cache=True)
 def morton_encode(x, y):
     """
     Encode 2D coordinates into Morton code (Z-order curve).
@@ -88,6 +97,46 @@ def morton_encode(x, y):
     return part1by1(x) | (part1by1(y) << 1)
 
 
+# Hardware Morton encoding: on x86-64 with BMI2 a single PDEP instruction
+# deposits the bits of a coordinate by mask, replacing the ~10 shift/AND
+# passes of the magic-bits encode. Detected at import; falls back to the
+# portable morton_encode elsewhere.
+try:
+    import llvmlite.binding as _llvm
+    _HAVE_BMI2 = bool(_llvm.get_host_cpu_features().get('bmi2', False))
+except Exception:
+    _HAVE_BMI2 = False
+
+if _HAVE_BMI2:
+    from llvmlite import ir as _ir
+    from numba.core import types as _nb_types
+    from numba.extending import intrinsic as _nb_intrinsic
+
+    @_nb_intrinsic
+    def _pdep_u64(typingctx, x, mask):
+        """numba intrinsic wrapping the BMI2 PDEP instruction."""
+        sig = _nb_types.uint64(_nb_types.uint64, _nb_types.uint64)
+
+        def codegen(context, builder, signature, args):
+            i64 = _ir.IntType(64)
+            fnty = _ir.FunctionType(i64, [i64, i64])
+            fn = builder.module.globals.get('llvm.x86.bmi.pdep.64')
+            if fn is None:
+                fn = _ir.Function(builder.module, fnty, name='llvm.x86.bmi.pdep.64')
+            return builder.call(fn, args)
+
+        return sig, codegen
+
+    @numba.njit(cache=True)
+    def _morton_encode_hw(x, y):
+        """Morton encode via two PDEP deposits (BMI2 hosts only)."""
+        return (_pdep_u64(np.uint64(x), np.uint64(0x5555555555555555)) |
+                _pdep_u64(np.uint64(y), np.uint64(0xAAAAAAAAAAAAAAAA)))
+else:
+    _morton_encode_hw = morton_encode
+
+
+@numba.njit(cache=True)
 def hilbert_encode(x, y, order=16):
     """
     Encode 2D coordinates into Hilbert curve index.
@@ -125,6 +174,20 @@ def hilbert_encode(x, y, order=16):
     return d
 
 
+@numba.njit(parallel=True, cache=True)
+def morton_encode_array(x, y, out):
+    """Morton-encode coordinate arrays in parallel into a preallocated output."""
+    for i in numba.prange(x.shape[0]):
+        out[i] = _morton_encode_hw(np.int64(x[i]), np.int64(y[i]))
+
+
+@numba.njit(parallel=True, cache=True)
+def hilbert_encode_array(x, y, order, out):
+    """Hilbert-encode coordinate arrays in parallel into a preallocated output."""
+    for i in numba.prange(x.shape[0]):
+        out[i] = hilbert_encode(np.int64(x[i]), np.int64(y[i]), order)
+
+
 def create_spatial_sort_index(lat, lon, method='hilbert'):
     """
     Create a spatial sorting index using space-filling curves for optimal spatial locality.
@@ -165,30 +228,34 @@ def create_spatial_sort_index(lat, lon, method='hilbert'):
     print(f"  Computing space-filling curve indices for {len(lat):,} nodes...")
     start = time.time()
 
-    # Compute spatial keys using chosen method
+    # Coastal meshes pack many nodes into the same grid cell, so encode
+    # each distinct (x, y) cell once and scatter the keys back
+    packed = (lat_grid.astype(np.uint64) << np.uint64(32)) | lon_grid.astype(np.uint64)
+    uniq, inverse = np.unique(packed, return_inverse=True)
+    uniq_x = (uniq & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    uniq_y = (uniq >> np.uint64(32)).astype(np.uint32)
+    print(f"  {len(uniq):,} distinct grid cells")
+
+    # Compute spatial keys using chosen method (JIT-compiled, parallel)
+    uniq_keys = np.empty(len(uniq), dtype=np.uint64)
     if method == 'hilbert':
-        # Vectorized Hilbert encoding
-        spatial_keys = np.array([
-            hilbert_encode(int(x), int(y), order)
-            for x, y in zip(lon_grid, lat_grid)
-        ], dtype=np.uint64)
+        hilbert_encode_array(uniq_x, uniq_y, order, uniq_keys)
     else:  # morton
-        # Vectorized Morton encoding
-        spatial_keys = np.array([
-            morton_encode(int(x), int(y))
-            for x, y in zip(lon_grid, lat_grid)
-        ], dtype=np.uint64)
+        morton_encode_array(uniq_x, uniq_y, uniq_keys)
+    spatial_keys = uniq_keys[inverse]
 
     elapsed = time.time() - start
     print(f"  Computed spatial keys in {elapsed:.2f}s")
 
     # Sort by spatial key to group nearby nodes
     print(f"  Sorting {len(spatial_keys):,} indices...")
-    sorted_indices = np.argsort(spatial_keys)
+    sorted_indices = np.argsort(spatial_keys, kind='stable')
 
     print(f"✓ Spatial sorting complete using {method.upper()} curve")
 
-    return sorted_indices
+    # Node counts fit comfortably in 32 bits; storing the permutation (and
+    # everything derived from it) as uint32 halves index bytes on disk
+    return sorted_indices.astype(np.uint32)
 
 
 def remap_elements(elements_nc, spatial_sort_idx):
@@ -204,16 +271,15 @@ def remap_elements(elements_nc, spatial_sort_idx):
     """
     print("Remapping element connectivity to sorted node indices...")
 
-    # Create inverse mapping: original_idx -> new_idx
-    inverse_mapping = np.zeros(len(spatial_sort_idx), dtype=np.int32)
-    for new_idx, orig_idx in enumerate(spatial_sort_idx):
-        inverse_mapping[orig_idx] = new_idx
+    # Create inverse mapping (original_idx -> new_idx) with one C-level scatter
+    inverse_mapping = np.empty(len(spatial_sort_idx), dtype=np.uint32)
+    inverse_mapping[spatial_sort_idx] = np.arange(len(spatial_sort_idx), dtype=np.uint32)
 
     # Remap all element indices
     elements_sorted = inverse_mapping[elements_nc]
 
     # Validate
-    if elements_sorted.min() < 0 or elements_sorted.max() >= len(spatial_sort_idx):
+    if elements_sorted.max() >= len(spatial_sort_idx):
         raise ValueError(f"Invalid element indices after remapping!")
 
     print(f"✓ Element indices remapped and validated")
@@ -221,9 +287,15 @@ def remap_elements(elements_nc, spatial_sort_idx):
     return elements_sorted
 
 
-def convert_to_zarr():
+def convert_to_zarr(variables=None):
     """
     Main conversion function: netCDF -> Zarr with spatial chunking.
+
+    Args:
+        variables: Optional list of variable names. When given and the
+            store already exists, only those variables are rewritten in
+            place (mode='a') instead of recompressing the whole store —
+            useful when iterating on the encoding of a single field.
     """
     print(f"Reading netCDF file: {NC_FILE}")
     print(f"Output Zarr store: {ZARR_OUTPUT}")
@@ -231,8 +303,10 @@ def convert_to_zarr():
 
     start_time = time.time()
 
-    # Open the netCDF file with xarray
-    ds = xr.open_dataset(NC_FILE)
+    # Open the netCDF file lazily (dask-backed): amp/phase variables are
+    # never fully materialized — they stream through selection, permutation
+    # and the Zarr write one node-chunk at a time
+    ds = xr.open_dataset(NC_FILE, chunks={'node': SPATIAL_CHUNK_SIZE})
 
     print(f"Dataset dimensions: {dict(ds.sizes)}")
     print(f"Total nodes: {ds.sizes['node']:,}")
@@ -244,15 +318,15 @@ def convert_to_zarr():
     print(f"  {', '.join(tidenames)}")
     print()
 
-    # Find indices for main constituents
+    # Find indices for main constituents (single pass over tidenames)
+    name_to_idx = {name: i for i, name in enumerate(tidenames)}
     constituent_indices = []
     found_constituents = []
     for const in MAIN_CONSTITUENTS:
-        try:
-            idx = tidenames.index(const)
-            constituent_indices.append(idx)
+        if const in name_to_idx:
+            constituent_indices.append(name_to_idx[const])
             found_constituents.append(const)
-        except ValueError:
+        else:
             print(f"Warning: Constituent '{const}' not found in dataset")
 
     print(f"Extracting {len(found_constituents)} main constituents:")
@@ -272,6 +346,17 @@ def convert_to_zarr():
     lon_sorted = lon[spatial_sort_idx]
     depth_sorted = depth[spatial_sort_idx]
 
+    # Per-chunk bounding rectangles: after the sort each SPATIAL_CHUNK_SIZE
+    # run of nodes covers a small patch, so a reader can prune a bbox query
+    # to the overlapping chunks from this one tiny array without fetching
+    # lat/lon at all
+    n_node_chunks = -(-len(lat_sorted) // SPATIAL_CHUNK_SIZE)
+    chunk_bbox = np.empty((n_node_chunks, 4), dtype=np.float32)
+    for i in range(n_node_chunks):
+        sl = slice(i * SPATIAL_CHUNK_SIZE, (i + 1) * SPATIAL_CHUNK_SIZE)
+        chunk_bbox[i] = (lat_sorted[sl].min(), lat_sorted[sl].max(),
+                         lon_sorted[sl].min(), lon_sorted[sl].max())
+
     print(f"Spatial range:")
     print(f"  Latitude:  {lat.min():.2f}° to {lat.max():.2f}°")
     print(f"  Longitude: {lon.min():.2f}° to {lon.max():.2f}°")
@@ -292,6 +377,12 @@ def convert_to_zarr():
 
     # Remap element indices to spatially sorted node ordering
     elements_sorted = remap_elements(elements_nc, spatial_sort_idx)
+
+    # Reorder element rows by their lowest vertex index so triangle chunks
+    # follow the node ordering — a bbox query then touches only the element
+    # chunks covering its node range instead of scanning all of them
+    ele_perm = np.argsort(elements_sorted.min(axis=1), kind='stable')
+    elements_sorted = elements_sorted[ele_perm]
     print()
 
     # Extract tide frequencies for main constituents
@@ -307,27 +398,40 @@ def convert_to_zarr():
 
     print("Extracting velocity components...")
 
-    # Remove the depth-averaged dimension first (get all constituents)
-    u_amp_all = ds['u_amp'].values[0, :, :]  # Shape: (node, ntides)
-    v_amp_all = ds['v_amp'].values[0, :, :]
-    u_phase_all = ds['u_phase'].values[0, :, :]
-    v_phase_all = ds['v_phase'].values[0, :, :]
-
-    # Apply spatial sorting first (to all constituents)
-    u_amp_sorted_all = u_amp_all[spatial_sort_idx, :]
-    v_amp_sorted_all = v_amp_all[spatial_sort_idx, :]
-    u_phase_sorted_all = u_phase_all[spatial_sort_idx, :]
-    v_phase_sorted_all = v_phase_all[spatial_sort_idx, :]
-
-    # Now select only the main constituents using numpy array indexing
+    # Select the main constituent columns first (pushed into the netCDF
+    # read via isel), then gather the sorted rows — this avoids copying
+    # and sorting the full ~37-constituent arrays only to discard most
+    # columns afterwards
     constituent_indices_arr = np.array(constituent_indices)
-    u_amp_sorted = u_amp_sorted_all[:, constituent_indices_arr]
-    v_amp_sorted = v_amp_sorted_all[:, constituent_indices_arr]
-    u_phase_sorted = u_phase_sorted_all[:, constituent_indices_arr]
-    v_phase_sorted = v_phase_sorted_all[:, constituent_indices_arr]
+
+    def extract_sorted(var_name):
+        depth_dim, node_dim, tides_dim = ds[var_name].dims
+        selected = ds[var_name].isel({depth_dim: 0,
+                                      tides_dim: constituent_indices_arr})
+        # Lazy permutation; dask streams read + gather + write per chunk
+        node_indexer = xr.DataArray(spatial_sort_idx, dims=node_dim)
+        return selected.isel({node_dim: node_indexer}).data
+
+    u_amp_sorted = extract_sorted('u_amp')
+    v_amp_sorted = extract_sorted('v_amp')
+    u_phase_sorted = extract_sorted('u_phase')
+    v_phase_sorted = extract_sorted('v_phase')
+
+    # Normalize phases into [0, 360) so the uint16 encoding below is exact
+    u_phase_sorted = np.mod(u_phase_sorted, 360.0)
+    v_phase_sorted = np.mod(v_phase_sorted, 360.0)
+
+    # Size node shards analytically from the byte-range target: each node
+    # carries 4 amp/phase values per constituent at 4 bytes apiece. Shards
+    # must be whole multiples of the fine SPATIAL_CHUNK_SIZE chunks.
+    bytes_per_node = 4 * len(found_constituents) * 4
+    shard_multiple = max(1, TARGET_CHUNK_BYTES // bytes_per_node // SPATIAL_CHUNK_SIZE)
+    spatial_chunk_size = SPATIAL_CHUNK_SIZE * shard_multiple
 
     # Create new xarray dataset with sorted data and proper chunking
-    print(f"Creating Zarr dataset with spatial chunks of {SPATIAL_CHUNK_SIZE:,} nodes...")
+    print(f"Creating Zarr dataset with spatial chunks of {SPATIAL_CHUNK_SIZE:,} nodes "
+          f"packed {shard_multiple} per shard "
+          f"(~{spatial_chunk_size * bytes_per_node / 1e6:.1f} MB of amp/phase per shard)...")
 
     ds_zarr = xr.Dataset(
         {
@@ -379,6 +483,11 @@ def convert_to_zarr():
             'constituent_names': (['constituent'], found_constituents, {
                 'long_name': 'Tidal constituent names'
             }),
+            'chunk_bbox': (['chunk', 'coord'], chunk_bbox, {
+                'long_name': 'Per-node-chunk bounding rectangle',
+                'description': 'lat_min, lat_max, lon_min, lon_max for each '
+                               'chunk_size_nodes run of sorted nodes'
+            }),
         },
         attrs={
             'title': 'ADCIRC Tidal Constituents (Zarr format)',
@@ -388,44 +497,143 @@ def convert_to_zarr():
             'institution': 'NOAA/NOS/OCS/CSDL/MMAP',
             'spatial_sorting': f'{SPATIAL_ORDER_METHOD.capitalize()} space-filling curve (order-16)',
             'chunk_size_nodes': SPATIAL_CHUNK_SIZE,
+            'shard_size_nodes': spatial_chunk_size,
             'chunk_size_elements': ELEMENT_CHUNK_SIZE,
             'created': time.strftime('%Y-%m-%d %H:%M:%S'),
         }
     )
 
-    # Add the original node indices as a variable (for reference)
-    ds_zarr['original_node_index'] = (['node'], spatial_sort_idx, {
-        'long_name': 'Original node index in source netCDF',
-        'description': 'Maps sorted nodes back to original netCDF indices'
-    })
+    # Optionally add the original node indices as a variable (for reference)
+    if STORE_ORIGINAL_INDEX:
+        ds_zarr['original_node_index'] = (['node'], spatial_sort_idx, {
+            'long_name': 'Original node index in source netCDF',
+            'description': 'Maps sorted nodes back to original netCDF indices'
+        })
 
     # Define chunking strategy
     # Chunk along the node dimension for spatial queries
     # Keep all constituents together since they're usually queried together
     # Chunk elements for efficient mesh queries
     chunks = {
-        'node': SPATIAL_CHUNK_SIZE,
+        'node': spatial_chunk_size,
         'element': ELEMENT_CHUNK_SIZE,
         'constituent': len(found_constituents),
-        'nv': 3  # Always 3 vertices per triangle
+        'nv': 3,  # Always 3 vertices per triangle
+        'chunk': n_node_chunks,  # single chunk: pruning fetches one object
+        'coord': 4
     }
 
+    # Back the dataset with dask so to_zarr streams one chunk at a time
+    # instead of materializing whole variables in the write path
+    ds_zarr = ds_zarr.chunk(chunks)
+
     # Write to Zarr format
     print(f"Writing Zarr store to {ZARR_OUTPUT}...")
 
-    # Remove existing zarr store if it exists
-    if ZARR_OUTPUT.exists():
+    incremental = variables is not None and ZARR_OUTPUT.exists()
+
+    # Remove existing zarr store if doing a full rewrite
+    if ZARR_OUTPUT.exists() and not incremental:
         import shutil
         shutil.rmtree(ZARR_OUTPUT)
 
-    # Write to Zarr with default compression (automatically uses efficient codecs)
-    # Zarr v3 uses good defaults, so we don't need to specify encoding
-    ds_zarr.to_zarr(
-        ZARR_OUTPUT,
-        mode='w',
-        consolidated=True,  # Create consolidated metadata for faster access
-        compute=True
-    )
+    # Blosc-Zstd with bit shuffle: regrouping bit planes exploits the
+    # correlated mantissa/low-entropy bits of smooth geophysical fields and
+    # compresses a further step beyond byte shuffle, cutting the bytes
+    # fetched per bbox query against S3
+    compressor = BloscCodec(cname='zstd', clevel=5, shuffle='bitshuffle')
+    encoding = {
+        var: {'compressors': (compressor,)}
+        for var in ('lat', 'lon', 'depth',
+                    'u_amp', 'v_amp', 'u_phase', 'v_phase')
+    }
+
+    # Coordinates and depth don't need float64: float32 resolves ~1e-7
+    # degrees (centimetres) and halves the bytes every query moves
+    for var in ('lat', 'lon', 'depth'):
+        encoding[var]['dtype'] = 'float32'
+
+    # Phases live in [0, 360) degrees and don't need a float32 mantissa:
+    # store them as uint16 hundredths of a degree (CF scale_factor), which
+    # halves phase chunk bytes. Readers decode back to float transparently.
+    for var in ('u_phase', 'v_phase'):
+        encoding[var].update({
+            'dtype': 'uint16',
+            'scale_factor': np.float32(0.01),
+            '_FillValue': None,
+        })
+
+    # Amplitudes get a data-dependent int16 scale: ~15 bits across the
+    # observed range is ample resolution for m/s tidal amplitudes and
+    # halves amp chunk bytes the same way
+    amp_max = max(float(u_amp_sorted.max()), float(v_amp_sorted.max()))
+    amp_scale = amp_max / 32000.0 if amp_max > 0 else 1.0
+    for var in ('u_amp', 'v_amp'):
+        encoding[var].update({
+            'dtype': 'int16',
+            'scale_factor': amp_scale,
+            'add_offset': 0.0,
+            '_FillValue': np.int16(-32768),
+        })
+
+    # Zarr v3 sharding: keep the fine SPATIAL_CHUNK_SIZE read granularity
+    # for small bbox queries, but bundle shard_multiple chunks into each
+    # stored object — the store holds that factor fewer files while byte
+    # ranges within a shard still fetch single chunks
+    n_const = len(found_constituents)
+    for var in ('lat', 'lon', 'depth'):
+        encoding[var].update({
+            'chunks': (SPATIAL_CHUNK_SIZE,),
+            'shards': (spatial_chunk_size,),
+        })
+    for var in ('u_amp', 'v_amp', 'u_phase', 'v_phase'):
+        encoding[var].update({
+            'chunks': (SPATIAL_CHUNK_SIZE, n_const),
+            'shards': (spatial_chunk_size, n_const),
+        })
+
+    if STORE_ORIGINAL_INDEX:
+        # Permutation data barely compresses; lean on zstd at max effort
+        encoding['original_node_index'] = {
+            'compressors': (BloscCodec(cname='zstd', clevel=9, shuffle='shuffle'),),
+            'chunks': (SPATIAL_CHUNK_SIZE,),
+            'shards': (spatial_chunk_size,),
+        }
+
+    if incremental:
+        # Rewrite only the requested variables; everything else in the
+        # store keeps its existing bytes (no rmtree, no full recompress)
+        unknown = [v for v in variables if v not in ds_zarr]
+        if unknown:
+            raise ValueError(f"Unknown variables for incremental write: {unknown}")
+        # Existing arrays keep their on-disk encoding; xarray rejects an
+        # encoding dict for variables that already exist in the store
+        print(f"Incremental write of: {', '.join(variables)}")
+        ds_zarr[list(variables)].to_zarr(
+            ZARR_OUTPUT,
+            mode='a',
+            consolidated=True,
+            compute=True
+        )
+    else:
+        ds_zarr.to_zarr(
+            ZARR_OUTPUT,
+            mode='w',
+            consolidated=True,  # Create consolidated metadata for faster access
+            encoding=encoding,
+            compute=True
+        )
+
+        # Persistent spatial index: a KD-tree over the sorted coordinates
+        # lets query scripts resolve a bbox in O(log N + k) without
+        # scanning lat/lon at all (the mesh is static, so build it once)
+        import pickle
+        from scipy.spatial import cKDTree
+
+        tree = cKDTree(np.column_stack([lon_sorted, lat_sorted]))
+        with open(KDTREE_SIDECAR, 'wb') as f:
+            pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL)
+        print(f"KD-tree sidecar written to {KDTREE_SIDECAR}")
 
     elapsed = time.time() - start_time
 
@@ -447,14 +655,30 @@ def convert_to_zarr():
 
 def get_dir_size(path):
     """Calculate total size of a directory."""
+    # os.scandir DirEntry objects carry stat info from the directory read,
+    # avoiding a per-file stat syscall and Path allocation for every chunk
     total = 0
-    for entry in Path(path).rglob('*'):
-        if entry.is_file():
-            total += entry.stat().st_size
+    stack = [str(path)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+                elif entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
     return total
 
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ADCIRC netCDF to Zarr converter')
+    parser.add_argument(
+        '--variables',
+        help='Comma-separated variable names to rewrite in an existing '
+             'store (skips the full-store rewrite)')
+    args = parser.parse_args()
+
     if not NC_FILE.exists():
         print(f"ERROR: Input file not found: {NC_FILE}")
         sys.exit(1)
@@ -464,4 +688,5 @@ if __name__ == '__main__':
     print("=" * 60)
     print()
 
-    convert_to_zarr()
+    convert_to_zarr(
+        variables=args.variables.split(',') if args.variables else None)
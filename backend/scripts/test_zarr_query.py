@@ -9,36 +9,10 @@ Usage:
     python test_zarr_query.py
 """
 
-import xarray as xr
 import numpy as np
-from pathlib import Path
 import time
 
-
-ZARR_STORE = Path(__file__).parent.parent.parent / "data" / "adcirc54.zarr"
-
-
-def query_bounding_box(ds, min_lat, max_lat, min_lon, max_lon):
-    """
-    Query nodes within a bounding box.
-
-    Args:
-        ds: xarray Dataset opened from Zarr
-        min_lat, max_lat: Latitude bounds
-        min_lon, max_lon: Longitude bounds
-
-    Returns:
-        xarray Dataset with filtered nodes
-    """
-    # Create boolean mask for nodes in bounding box
-    lat_mask = (ds['lat'] >= min_lat) & (ds['lat'] <= max_lat)
-    lon_mask = (ds['lon'] >= min_lon) & (ds['lon'] <= max_lon)
-    bbox_mask = lat_mask & lon_mask
-
-    # Filter dataset
-    ds_filtered = ds.where(bbox_mask, drop=True)
-
-    return ds_filtered
+from _zarr_query import ZARR_STORE, open_store, query_bounding_box
 
 
 def test_queries():
@@ -47,16 +21,21 @@ def test_queries():
     print(f"Opening Zarr store: {ZARR_STORE}")
     print()
 
-    # Open Zarr store
-    ds = xr.open_zarr(ZARR_STORE, consolidated=True)
+    # Open Zarr store (cached across calls)
+    ds = open_store(str(ZARR_STORE))
 
     print("Dataset info:")
-    print(f"  Total nodes: {ds.dims['node']:,}")
-    print(f"  Constituents: {', '.join([str(c.values) for c in ds['constituent_names']])}")
+    print(f"  Total nodes: {ds.sizes['node']:,}")
+    constituent_names = ds['constituent_names'].values.astype(str).tolist()
+    print(f"  Constituents: {', '.join(constituent_names)}")
     print(f"  Latitude range: {float(ds['lat'].min()):.2f}° to {float(ds['lat'].max()):.2f}°")
     print(f"  Longitude range: {float(ds['lon'].min()):.2f}° to {float(ds['lon'].max()):.2f}°")
     print()
 
+    # Throwaway query: warms the store, the KD-tree sidecar and the JIT
+    # kernel so the timings below measure queries, not first-touch setup
+    query_bounding_box(ds, 0.0, 0.1, 0.0, 0.1)
+
     # Test 1: Miami/Florida Keys area
     print("=" * 60)
     print("Test 1: Miami / Florida Keys")
@@ -69,21 +48,22 @@ def test_queries():
         'max_lon': -80.0
     }
 
-    start = time.time()
+    start = time.perf_counter_ns()
     result = query_bounding_box(ds, **bbox)
-    query_time = time.time() - start
+    result['lat'].values  # force materialization so the gather is timed
+    query_time_ms = (time.perf_counter_ns() - start) / 1e6
 
     print(f"Bounding box: {bbox}")
-    print(f"Nodes found: {result.dims['node']:,}")
-    print(f"Query time: {query_time*1000:.1f} ms")
+    print(f"Nodes found: {result.sizes['node']:,}")
+    print(f"Query time: {query_time_ms:.1f} ms")
 
-    if result.dims['node'] > 0:
+    if result.sizes['node'] > 0:
         # Get M2 constituent data (first constituent)
         m2_u_amp = result['u_amp'].isel(constituent=0).values
         m2_v_amp = result['v_amp'].isel(constituent=0).values
 
         # Calculate speed amplitude
-        m2_speed = np.sqrt(m2_u_amp**2 + m2_v_amp**2)
+        m2_speed = np.hypot(m2_u_amp, m2_v_amp)
 
         print(f"M2 constituent stats:")
         print(f"  Max speed amplitude: {np.nanmax(m2_speed):.3f} m/s")
@@ -102,19 +82,20 @@ def test_queries():
         'max_lon': -85.0
     }
 
-    start = time.time()
+    start = time.perf_counter_ns()
     result = query_bounding_box(ds, **bbox)
-    query_time = time.time() - start
+    result['lat'].values  # force materialization so the gather is timed
+    query_time_ms = (time.perf_counter_ns() - start) / 1e6
 
     print(f"Bounding box: {bbox}")
-    print(f"Nodes found: {result.dims['node']:,}")
-    print(f"Query time: {query_time*1000:.1f} ms")
+    print(f"Nodes found: {result.sizes['node']:,}")
+    print(f"Query time: {query_time_ms:.1f} ms")
 
-    if result.dims['node'] > 0:
+    if result.sizes['node'] > 0:
         # Get M2 constituent data
         m2_u_amp = result['u_amp'].isel(constituent=0).values
         m2_v_amp = result['v_amp'].isel(constituent=0).values
-        m2_speed = np.sqrt(m2_u_amp**2 + m2_v_amp**2)
+        m2_speed = np.hypot(m2_u_amp, m2_v_amp)
 
         print(f"M2 constituent stats:")
         print(f"  Max speed amplitude: {np.nanmax(m2_speed):.3f} m/s")
@@ -133,19 +114,20 @@ def test_queries():
         'max_lon': -73.5
     }
 
-    start = time.time()
+    start = time.perf_counter_ns()
     result = query_bounding_box(ds, **bbox)
-    query_time = time.time() - start
+    result['lat'].values  # force materialization so the gather is timed
+    query_time_ms = (time.perf_counter_ns() - start) / 1e6
 
     print(f"Bounding box: {bbox}")
-    print(f"Nodes found: {result.dims['node']:,}")
-    print(f"Query time: {query_time*1000:.1f} ms")
+    print(f"Nodes found: {result.sizes['node']:,}")
+    print(f"Query time: {query_time_ms:.1f} ms")
 
-    if result.dims['node'] > 0:
+    if result.sizes['node'] > 0:
         # Get M2 constituent data
         m2_u_amp = result['u_amp'].isel(constituent=0).values
         m2_v_amp = result['v_amp'].isel(constituent=0).values
-        m2_speed = np.sqrt(m2_u_amp**2 + m2_v_amp**2)
+        m2_speed = np.hypot(m2_u_amp, m2_v_amp)
 
         print(f"M2 constituent stats:")
         print(f"  Max speed amplitude: {np.nanmax(m2_speed):.3f} m/s")
@@ -168,7 +150,7 @@ def demonstrate_api_response():
     print("=" * 60)
     print()
 
-    ds = xr.open_zarr(ZARR_STORE, consolidated=True)
+    ds = open_store(str(ZARR_STORE))
 
     # Query a small area
     bbox = {
@@ -180,38 +162,46 @@ def demonstrate_api_response():
 
     result = query_bounding_box(ds, **bbox)
 
-    if result.dims['node'] > 0:
+    if result.sizes['node'] > 0:
         # Limit to first 10 nodes for demo
-        sample = result.isel(node=slice(0, min(10, result.dims['node'])))
+        sample = result.isel(node=slice(0, min(10, result.sizes['node'])))
+
+        # Materialize the sample as plain NumPy arrays once; every
+        # .isel(...).values inside the loop would be a full xarray
+        # dispatch plus a 0-d array allocation per field per node
+        lats = sample['lat'].values
+        lons = sample['lon'].values
+        depths = sample['depth'].values
+        u_amp = sample['u_amp'].values
+        u_phase = sample['u_phase'].values
+        v_amp = sample['v_amp'].values
+        v_phase = sample['v_phase'].values
+        constituents = result['constituent_names'].values.astype(str).tolist()
 
         # Format as you would for API response
         response_data = {
             'bbox': bbox,
-            'node_count': int(result.dims['node']),
-            'constituents': [str(result['constituent_names'].isel(constituent=i).values)
-                           for i in range(len(result['constituent_names']))],
+            'node_count': int(result.sizes['node']),
+            'constituents': constituents,
             'nodes': []
         }
 
-        for i in range(sample.dims['node']):
+        for i in range(len(lats)):
             node_data = {
-                'lat': float(sample['lat'].isel(node=i).values),
-                'lon': float(sample['lon'].isel(node=i).values),
-                'depth': float(sample['depth'].isel(node=i).values),
-                'tidal_data': []
+                'lat': float(lats[i]),
+                'lon': float(lons[i]),
+                'depth': float(depths[i]),
+                'tidal_data': [
+                    {
+                        'constituent': const_name,
+                        'u_amplitude': float(u_amp[i, j]),
+                        'u_phase': float(u_phase[i, j]),
+                        'v_amplitude': float(v_amp[i, j]),
+                        'v_phase': float(v_phase[i, j]),
+                    }
+                    for j, const_name in enumerate(constituents)
+                ],
             }
-
-            # Add constituent data
-            for j, const_name in enumerate(response_data['constituents']):
-                constituent_data = {
-                    'constituent': const_name,
-                    'u_amplitude': float(sample['u_amp'].isel(node=i, constituent=j).values),
-                    'u_phase': float(sample['u_phase'].isel(node=i, constituent=j).values),
-                    'v_amplitude': float(sample['v_amp'].isel(node=i, constituent=j).values),
-                    'v_phase': float(sample['v_phase'].isel(node=i, constituent=j).values),
-                }
-                node_data['tidal_data'].append(constituent_data)
-
             response_data['nodes'].append(node_data)
 
         # Pretty print sample